@@ -7,18 +7,20 @@ from __future__ import annotations
 import logging
 import re
 
+from operator import itemgetter
 from typing import TYPE_CHECKING, Optional
 from unicodedata import category
 
 # Third party imports
 import discord  # noqa
-from async_lru import alru_cache
 from discord import app_commands
 from discord.ext import commands
 from discord.ext.commands.view import StringView
 
 
 # Local application imports
+from main.cogs.utils import cache
+
 if TYPE_CHECKING:
     from main.Zen import Zen
     from main.cogs.utils.context import Context
@@ -62,6 +64,14 @@ class StringMemberTransformer(app_commands.Transformer):
 class Game(commands.Cog):
     def __init__(self, bot: Zen) -> None:
         self.bot: Zen = bot
+        self._game_enabled: cache.SettingsCache[bool] = cache.SettingsCache(
+            bot, 'enable_game', itemgetter('enable_game'))
+
+    async def cog_load(self) -> None:
+        await self._game_enabled.load()
+
+    async def cog_unload(self) -> None:
+        self._game_enabled.close()
 
     @property
     def display_emoji(self) -> discord.PartialEmoji:
@@ -385,22 +395,8 @@ class Game(commands.Cog):
             return
 
     # __________________ Game Enabled __________________
-    @alru_cache(maxsize=128)
     async def _get_game_enabled(self, server_id: int) -> Optional[bool]:
-        # Get pool
-        conn = self.bot.pool
-
-        try:
-            sql = 'SELECT enable_game FROM settings WHERE server_id=$1'
-            res = await conn.fetchrow(sql, server_id)
-
-            if res is not None:
-                return res['enable_game']
-            else:
-                return None
-
-        except Exception:
-            log.error('Error while checking enabled game.', exc_info=True)
+        return await self._game_enabled.get(server_id)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
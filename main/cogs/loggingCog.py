@@ -9,15 +9,16 @@ import logging
 import re
 
 from itertools import zip_longest
+from operator import itemgetter
 from typing import TYPE_CHECKING, Optional
 
 # Third party imports
 import discord  # noqa
-from async_lru import alru_cache
 from discord.ext import commands
 
 
 # Local application imports
+from main.cogs.utils import cache
 from main.cogs.utils.formats import text_color
 
 
@@ -40,6 +41,14 @@ log = logging.getLogger(__name__)
 class LoggingCog(commands.Cog):
     def __init__(self, bot: Zen) -> None:
         self.bot: Zen = bot
+        self._logging_channels: cache.SettingsCache[Optional[int]] = cache.SettingsCache(
+            bot, 'logging_channel', itemgetter('logging_channel'))
+
+    async def cog_load(self) -> None:
+        await self._logging_channels.load()
+
+    async def cog_unload(self) -> None:
+        self._logging_channels.close()
 
     # --------------------------------------------------
     #                  Message Create
@@ -271,23 +280,8 @@ class LoggingCog(commands.Cog):
 
     # --------------------------------------------------
     #                  Get Logging Channel
-    @alru_cache(maxsize=128)
     async def _get_logging_channel(self, server_id: int) -> Optional[int]:
-        # Get pool
-        conn = self.bot.pool
-
-        # Return channel_id
-        try:
-            sql = 'SELECT logging_channel FROM settings WHERE server_id=$1'
-            res = await conn.fetchrow(sql, server_id)
-
-            if res is not None:
-                return res['logging_channel']
-            else:
-                return None
-
-        except Exception:
-            log.error('Error while fetching log channel.', exc_info=True)
+        return await self._logging_channels.get(server_id)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -4,25 +4,28 @@
 from __future__ import annotations
 
 # Standard library imports
+from bisect import bisect_right
 from datetime import datetime
-from email import message
+from operator import itemgetter
+import asyncio
 import logging
 import re
 
-from typing import TYPE_CHECKING, Optional, TypedDict
+from typing import TYPE_CHECKING, Any, Coroutine, Iterable, NamedTuple, Optional, TypedDict
 
 # Third party imports
 import discord  # noqa
-from async_lru import alru_cache
 from discord import app_commands
 from discord.ext import commands
 
 
 # Local application imports
+from main.cogs.utils import cache
 from main.cogs.utils.paginator import TabularPages, SimplePages
 from main.cogs.utils.formats import format_dt
 
 if TYPE_CHECKING:
+    from asyncpg import Record
     from main.Zen import Zen
     from main.cogs.utils.context import Context
 
@@ -33,37 +36,66 @@ SYSTEM = 'rep'
 
 GuildWritableChannels = discord.TextChannel | discord.CategoryChannel | discord.ForumChannel | discord.Thread
 
+# Matched case-insensitively against the raw content, never a lowered copy
+THANKS_REGEX = re.compile(
+    r'(?<![A-Za-z])'
+    r'(?:(?<!no )(?:th(?:a?n?[kx])s?|ty(?:vm)?)|dankee?|ありがとう?)'
+    r'(?![A-Za-z])'
+    r'|:upvote:',
+    re.IGNORECASE,
+)
+UPVOTE_REGEX = re.compile('upvote', re.IGNORECASE)
+# System messages (joins, pins, boosts...) never carry a user's thanks
+USER_MESSAGE_TYPES = frozenset((discord.MessageType.default, discord.MessageType.reply))
+
+# Buffered rep is written in one statement per flush - see Rep._give_rep
+REP_FLUSH_DELAY = 0.2
+GIVE_REP_SQL = '''INSERT INTO rep (server_id, user_id, rep, last_received)
+                  SELECT * FROM unnest($1::bigint[], $2::bigint[], $3::int[], $4::timestamp[])
+                  ON CONFLICT (server_id, user_id)
+                  DO UPDATE SET rep=rep.rep + EXCLUDED.rep,
+                                last_received=EXCLUDED.last_received
+                  RETURNING server_id, user_id, rep'''
+
+
+def is_upvote(emoji: discord.PartialEmoji | discord.Emoji | str) -> bool:
+    name = emoji if isinstance(emoji, str) else emoji.name
+    return name is not None and UPVOTE_REGEX.search(name) is not None
+
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-#                      Rep Log Pages
+#                      Rep Settings
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-class RepLogEntry(TypedDict):
-    time: str
-    giver: str
-    receiver: str
-    amount: int
-    link: str
+class RepSettings(NamedTuple):
+    enabled: bool
+    excluded_channels: frozenset[int]
 
+    @classmethod
+    def from_record(cls, row: Record) -> RepSettings:
+        return cls(enabled=bool(row['enable_rep']), excluded_channels=frozenset(row['excluded_rep_channels']))
 
-class RepLogEntry:
-    __slots__ = ('time', 'giver', 'receiver', 'amount', 'link')
 
-    def __init__(self, entry: RepLogEntry) -> None:
-        self.time = entry['time']
-        self.giver = entry['giver']
-        self.receiver = entry['recipient']
-        self.amount = entry['amount']
-        self.link = entry['link']
+DEFAULT_SETTINGS = RepSettings(enabled=False, excluded_channels=frozenset())
 
-    def __str__(self) -> str:
-        msg = f'[{self.time}]({self.link}): `{self.giver}` gave `{self.receiver}` `{self.amount}` rep.'
 
-        return msg
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#                      Rep Log Pages
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class RepLogRow(TypedDict):
+    time: str
+    giver: str
+    recipient: str
+    amount: int
+    link: str
 
 
 class RepLogPages(SimplePages):
-    def __init__(self, entries: list[RepLogEntry], *, ctx: Context, per_page: int = 12):
-        converted = [RepLogEntry(entry) for entry in entries]
+    def __init__(self, entries: list[RepLogRow], *, ctx: Context, per_page: int = 12):
+        # Format once up front, pages only ever render the strings
+        converted = [
+            f"[{e['time']}]({e['link']}): `{e['giver']}` gave `{e['recipient']}` `{e['amount']}` rep."
+            for e in entries
+        ]
         super().__init__(converted, ctx=ctx, per_page=per_page)
 
 
@@ -73,6 +105,34 @@ class RepLogPages(SimplePages):
 class Rep(commands.Cog):
     def __init__(self, bot: Zen) -> None:
         self.bot: Zen = bot
+        self._settings: cache.SettingsCache[RepSettings] = cache.SettingsCache(
+            bot, 'enable_rep, excluded_rep_channels', RepSettings.from_record)
+        self._rewards: dict[int, list[tuple[int, int]]] = dict()
+        self._pending: set[asyncio.Task] = set()
+        self._rep_buffer: dict[tuple[int, int], tuple[int, datetime]] = dict()
+        self._rep_flushed: Optional[asyncio.Future[dict[tuple[int, int], int]]] = None
+
+    async def cog_load(self) -> None:
+        await self._settings.load()
+
+        # Warm rewards cache - entries are dropped by on_rewards_changed
+        try:
+            sql = '''SELECT server_id, val, role_id FROM rewards
+                     WHERE type=$1
+                     ORDER BY val ASC, role_id ASC'''
+            rewards = await self.bot.pool.fetch(sql, SYSTEM)
+        except Exception:
+            log.error('Error while loading rep rewards.', exc_info=True)
+            return
+
+        for row in rewards:
+            self._rewards.setdefault(row['server_id'], list()).append((row['val'], row['role_id']))
+
+    async def cog_unload(self) -> None:
+        self._settings.close()
+
+        # Write out rep still waiting in the buffer instead of dropping it
+        await self._write_rep()
 
     async def cog_check(self, ctx: Context) -> bool:
         return ctx.message.guild is not None
@@ -86,64 +146,60 @@ class Rep(commands.Cog):
     # ______________________ On Message Rep _______________________
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
-        # Check if rep enabled
-        if message.guild is None or not await self._get_rep_enabled(message.guild.id):
+        # Validation - cheapest checks first
+        if message.author.bot or len(message.mentions) == 0:
             return
 
-        # Check if forbidden channel
-        if await self._is_excluded_channel(message.channel, message.guild):
+        if message.type not in USER_MESSAGE_TYPES or len(message.content) < 2:
             return
 
-        if message.author.bot:
+        # Keyed by id so a user mentioned twice is only given rep once
+        author = message.author
+        users = list({u.id: u for u in message.mentions
+                      if u.id != author.id and not u.bot}.values())
+
+        if len(users) == 0:
             return
 
-        # Validation
-        def check(msg):
-            checks = [
-                r'(?<!no )(?<![A-z])th(a?n?(k|x)s?)(?![A-z])',
-                r'(?<!no )(?<![A-z])ty(vm)?(?![A-z])',
-                r'(?<![A-z])dankee?(?![A-z])',
-                r'(?<![A-z])ありがとう?(?![A-z])',
-                r':upvote:',
-            ]
+        if THANKS_REGEX.search(message.content) is None:
+            return
 
-            return any([re.search(x, msg) for x in checks])
+        if message.guild is None:
+            return
 
-        if len(message.mentions) == 0 or not check(message.content.lower()):
+        # Check if rep enabled and not a forbidden channel
+        settings = await self._get_rep_settings(message.guild.id)
+        if not settings.enabled or self._is_excluded_channel(message.channel, settings.excluded_channels):
             return
 
         # Data builder
-        conn = self.bot.pool
         guild = message.guild
-        author = message.author
-        channel = message.channel
-        users = [u for u in message.mentions if u.id !=
-                 author.id and not u.bot]
-        now = datetime.now()
-
-        if len(users) == 0:
-            return
+        now = message.created_at.replace(tzinfo=None)
 
         try:
-            sql = '''INSERT INTO rep (server_id, user_id, rep)
-                     VALUES ($1, $2, $3)
-                     ON CONFLICT (server_id, user_id)
-                     DO UPDATE SET rep=rep.rep + $3,
-                                   last_received = $4
-                     '''
-            vals = [(guild.id, u.id, 1, now) for u in users]
-            await conn.executemany(sql, vals)
+            reps = await self._give_rep(guild.id, [u.id for u in users], 1, now)
 
-            self.bot.dispatch('rep_received', message, guild, users)
+            self.bot.dispatch('rep_received', message, guild, users, reps)
 
         except Exception:
             log.error("Error when giving rep on message.", exc_info=True)
             return
 
-        msg = f'`Gave rep to {", ".join([u.display_name for u in users])}`'
-        await message.reply(content=msg)
+        self._create_task(message.add_reaction('👍'))
+        self._create_task(self._log_rep(guild, message, author, users, now))
 
-        await self._log_rep(guild, message, author, users, now)
+    # _____________________ Guild Remove  _______________________
+    @commands.Cog.listener(name='on_guild_remove')
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self._settings.invalidate(guild.id)
+        self._rewards.pop(guild.id, None)
+
+    # ____________________ Rewards Changed  _____________________
+    @commands.Cog.listener(name='on_rewards_changed')
+    async def on_rewards_changed(self, server_id: int, system: str) -> None:
+        # Re-read by _get_rewards on next use
+        if system == SYSTEM:
+            self._rewards.pop(server_id, None)
 
     # ________________________ Rep Receive _______________________
     @commands.Cog.listener(name='on_rep_received')
@@ -151,50 +207,48 @@ class Rep(commands.Cog):
         self,
         message: discord.Message,
         guild: discord.Guild,
-        members: list[discord.Member]
+        members: list[discord.Member],
+        reps: dict[int, int]
     ) -> None:
-        # Data builder
-        conn = self.bot.pool
-        roles: list[discord.Role] = list()
+        # Rewards are sorted by val - see _get_rewards
+        rewards = await self._get_rewards(guild.id)
+        if not rewards:
+            return
 
         try:
-            sql = '''SELECT user_id, rep FROM rep
-                  WHERE server_id=$1 AND user_id=ANY($2::bigint[])'''
-            rows = await conn.fetch(sql, guild.id, [u.id for u in members])
+            updates: list[tuple[discord.Member, list[discord.Role]]] = list()
+            for member in members:
+                have = {r.id for r in member.roles}
+                earned = rewards[:bisect_right(rewards, reps[member.id], key=itemgetter(0))]
+                roles = [role for _, role_id in earned
+                         if role_id not in have and (role := guild.get_role(role_id)) is not None]
 
-            # Data builder
-            mem_idx = [m.id for m in members]
-            max_rep = max([row['rep'] for row in rows])
-            rep_data: list[tuple[int, int]] = [
-                (row['user_id'], row['rep']) for row in rows]
+                if len(roles) > 0:
+                    updates.append((member, roles))
 
-            sql = '''SELECT role_id, val FROM rewards
-                     WHERE server_id=$1 AND type=$2 and val<=$3'''
-            res = await conn.fetch(sql, guild.id, SYSTEM, max_rep)
-
-            if len(res) == 0:
+            if len(updates) == 0:
                 return
 
-            for user, rep in rep_data:
-                member = members[mem_idx.index(user)]
-                for entry in res:
-                    if entry['val'] <= rep and member.get_role(entry['role_id']) is None:
-                        roles.append(guild.get_role(entry['role_id']))
-
-                if len(roles) < 1:
-                    continue
+            # Grant all roles concurrently, one failure shouldn't stop the rest
+            results = await asyncio.gather(
+                *(member.add_roles(*roles, reason='Rep reward') for member, roles in updates),
+                return_exceptions=True
+            )
 
-                await member.add_roles(*roles)
+        except Exception:
+            log.error('Error while checking rep rewards.', exc_info=True)
+            return
 
-                msg = f'`{member.display_name} gained the following roles(s): '
-                msg += f"{', '.join(role.name for role in roles)}`"
+        lines: list[str] = list()
+        for (member, roles), result in zip(updates, results):
+            if isinstance(result, BaseException):
+                log.error('Error while granting rep rewards.', exc_info=result)
+                continue
 
-                await message.channel.send(content=msg, delete_after=15)
-                roles.clear()
+            lines.append(f"`{member.display_name} gained the following roles(s): {', '.join(role.name for role in roles)}`")
 
-        except Exception:
-            log.error('Error while fetching rep rewards.', exc_info=True)
-            return
+        if len(lines) > 0:
+            await message.channel.send(content='\n'.join(lines), delete_after=15)
 
         return
 
@@ -205,47 +259,38 @@ class Rep(commands.Cog):
         reaction: discord.Reaction,
         member: discord.Member | discord.User
     ) -> None:
-
-        if reaction.message.guild is None:
+        if not is_upvote(reaction.emoji) or reaction.message.guild is None:
             return
 
         # Active Validation
-        if not await self._get_rep_enabled(reaction.message.guild.id):
+        settings = await self._get_rep_settings(reaction.message.guild.id)
+        if not settings.enabled:
             return
 
         # Data Builder
         author = reaction.message.author
         guild = reaction.message.guild
         channel = reaction.message.channel
-        conn = self.bot.pool
-        now = datetime.now()
+        now = discord.utils.utcnow().replace(tzinfo=None)
 
         # Validation
-        if await self._is_excluded_channel(channel, guild) or author.bot:
+        if self._is_excluded_channel(channel, settings.excluded_channels) or author.bot:
             return
 
         if author.id == member.id and not member.guild_permissions.administrator:
             return
 
-        if 'upvote' not in reaction.emoji.__str__().lower():
-            return
-
         try:
-            sql = '''INSERT INTO rep (server_id, user_id, rep)
-                     VALUES($1, $2, $3)
-                     ON CONFLICT (server_id, user_id)
-                     DO UPDATE SET rep=rep.rep + $3,
-                                   last_received=$4'''
-            await conn.execute(sql, guild.id, author.id, 1, now)
+            reps = await self._give_rep(guild.id, [author.id], 1, now)
             await reaction.message.add_reaction('✅')
 
-            self.bot.dispatch('rep_received', message, guild, [author])
+            self.bot.dispatch('rep_received', reaction.message, guild, [author], reps)
 
         except Exception:
             log.error('Error while giving reaction rep', exc_info=True)
             return
 
-        return await self._log_rep(guild, reaction.message, member, [author], now)
+        self._create_task(self._log_rep(guild, reaction.message, member, [author], now))
 
     # _____________________ On Reaction Remove _______________________
     @commands.Cog.listener(name='on_reaction_remove')
@@ -254,40 +299,32 @@ class Rep(commands.Cog):
         reaction: discord.Reaction,
         member: discord.Member | discord.User
     ) -> None:
-        if reaction.message.guild is None:
+        if not is_upvote(reaction.emoji) or reaction.message.guild is None:
             return
 
         # Active Validation
-        if not await self._get_rep_enabled(reaction.message.guild.id):
+        settings = await self._get_rep_settings(reaction.message.guild.id)
+        if not settings.enabled:
             return
 
         # Data Builder
         author = reaction.message.author
         guild = reaction.message.guild
         channel = reaction.message.channel
-        conn = self.bot.pool
-        now = datetime.now()
+        now = discord.utils.utcnow().replace(tzinfo=None)
 
         # Validation
-        if await self._is_excluded_channel(channel, guild) or author.bot:
+        if self._is_excluded_channel(channel, settings.excluded_channels) or author.bot:
             return
 
         if author.id == member.id and not member.guild_permissions.administrator:
             return
 
-        if 'upvote' not in reaction.emoji.__str__().lower():
-            return
-
         try:
-            sql = '''INSERT INTO rep (server_id, user_id, rep)
-                     VALUES($1, $2, $3)
-                     ON CONFLICT (server_id, user_id)
-                     DO UPDATE SET rep=rep.rep - $3,
-                                   last_received=$4'''
-            await conn.execute(sql, guild.id, author.id, 1, now)
+            await self._give_rep(guild.id, [author.id], -1, now)
 
             reactions = [
-                r for r in reaction.message.reactions if 'upvote' in r.__str__().lower()]
+                r for r in reaction.message.reactions if is_upvote(r.emoji)]
 
             if len(reactions) == 0:
                 await reaction.message.remove_reaction(emoji='✅', member=self.bot.user)
@@ -296,7 +333,7 @@ class Rep(commands.Cog):
             log.error('Error while giving reaction rep', exc_info=True)
             return
 
-        return await self._log_rep(guild, reaction.message, member, [author], now)
+        self._create_task(self._log_rep(guild, reaction.message, member, [author], now))
 
     # ________________________ Get XP _______________________
     @rep_group.command(name='get')
@@ -308,40 +345,34 @@ class Rep(commands.Cog):
     ) -> None:
         """ Get the rep information of a member or yourself. """
 
-        # Defer
-        await interaction.response.defer()
-
-        # Validation
-        if not await self._get_rep_enabled(interaction.guild_id):
-            return await interaction.edit_original_response(content=NOT_ENABLED)
+        # Validation - defers the interaction when enabled
+        if not await self._defer_if_enabled(interaction):
+            return
 
         member = member or interaction.user
         conn = self.bot.pool
 
         try:
-            # Get xp info
-            sql = ''' SELECT * FROM rep
-                      INNER JOIN logger
-                      ON
-                        rep.server_id=logger.server_id
-                      AND
-                        rep.user_id=logger.user_id
-                      WHERE rep.server_id=$1 AND rep.user_id=$2
+            # Get rep info - always returns a single row
+            sql = '''SELECT COALESCE(r.rep, 0) AS rep, l.last_gave_rep, r.last_received
+                     FROM (VALUES ($1::bigint, $2::bigint)) AS v(server_id, user_id)
+                     LEFT JOIN rep r USING (server_id, user_id)
+                     LEFT JOIN logger l USING (server_id, user_id)
             '''
             res = await conn.fetchrow(sql, interaction.guild_id, member.id)
         except Exception:
             log.error("Error while getting rep data.", exc_info=True)
             return
 
-        # Build message
-        rep: int = res['rep'] if res is not None else 0
+        # Build message - timestamps are stored as naive UTC
+        rep: int = res['rep']
         last_gave: str = format_dt(
-            res['last_gave_rep'], 'R', False) if res is not None else 'Never'
+            res['last_gave_rep'], 'R') if res['last_gave_rep'] is not None else 'Never'
         last_received: str = format_dt(
-            res['last_received'], 'R', False) if res is not None else 'Never'
+            res['last_received'], 'R') if res['last_received'] is not None else 'Never'
 
         e = discord.Embed(title=member.display_name,
-                          color=discord.Color.random())
+                          color=discord.Color(member.id & 0xFFFFFF))
         e.set_thumbnail(url=member.display_avatar.url)
         e.add_field(name='Rep', value=f'`{rep}`', inline=False)
         e.add_field(name='Last Gave', value=last_gave, inline=True)
@@ -360,54 +391,41 @@ class Rep(commands.Cog):
     ) -> None:
         """Gives another member rep - Requires admin
         """
-        # Defer
-        await interaction.response.defer()
+        # Validation - defers the interaction when enabled
+        if not await self._defer_if_enabled(interaction):
+            return
         rep = rep if rep is not None else 1
 
-        # Validation
-        if not await self._get_rep_enabled(interaction.guild_id):
-            return await interaction.edit_original_response(content=NOT_ENABLED)
-
-        is_admin = interaction.user.guild_permissions.administrator
-        if (rep > 1 or rep < 1) and not is_admin:
+        is_self = member.id == interaction.user.id
+        if (rep != 1 or is_self) and not interaction.user.guild_permissions.administrator:
             e = discord.Embed(
                 title='Error.',
-                description='Not authorized to give multi rep',
+                description="Can't give rep to yourself." if is_self else 'Not authorized to give multi rep',
                 color=discord.Color.red())
-            await interaction.edit_original_response(embed=e)
-
-        if (member.id == interaction.user.id) and not is_admin:
-            e = discord.Embed(
-                title='Error.',
-                description="Can't give rep to yourself.",
-                color=discord.Color.red())
-            await interaction.edit_original_response(embed=e)
+            return await interaction.edit_original_response(embed=e)
 
         # Data builder
         conn = self.bot.pool
-        now = datetime.now()
+        now = discord.utils.utcnow().replace(tzinfo=None)
         guild = interaction.guild
         author = interaction.user
         message = await interaction.original_response()
 
         try:
-            sql = '''SELECT * FROM rep WHERE server_id=$1 AND user_id=$2'''
-            res = await conn.fetchrow(sql, guild.id, member.id)
-
-            new_rep = res['rep'] + rep if res is not None else rep
-
             sql = '''INSERT INTO rep(server_id, user_id, rep)
                      VALUES($1, $2, $3)
                      ON CONFLICT (server_id, user_id)
-                     DO UPDATE SET rep=$3, last_received=$4
+                     DO UPDATE SET rep=rep.rep + EXCLUDED.rep, last_received=$4
+                     RETURNING rep
                 '''
-            await conn.execute(sql, guild.id, member.id, new_rep, now)
+            new_rep: int = await conn.fetchval(sql, guild.id, member.id, rep, now)
 
         except Exception:
             log.error("Error while getting xp data.", exc_info=True)
             return
 
-        self.bot.dispatch('rep_received', interaction.message, guild, [member])
+        if rep > 0:
+            self.bot.dispatch('rep_received', message, guild, [member], {member.id: new_rep})
         await interaction.edit_original_response(content=f'{member.display_name} now has `{new_rep}` rep.')
 
         return await self._log_rep(guild, message, author, [member], now, amount=rep)
@@ -451,51 +469,45 @@ class Rep(commands.Cog):
     @app_commands.describe(page='Go to a specific page.')
     async def leaderboard(self, interaction: discord.Interaction, page: Optional[int]) -> None:
         """ Display the Rep leaderboard for the server. """
-        # Defer
-        await interaction.response.defer()
-
-        # Validation
-        if not await self._get_rep_enabled(interaction.guild_id):
-            return await interaction.edit_original_response(content=NOT_ENABLED)
+        # Validation - defers the interaction when enabled
+        if not await self._defer_if_enabled(interaction):
+            return
 
         guild = interaction.guild
         conn = self.bot.pool
 
         # Get data
         try:
-            sql = '''SELECT 
-                     DENSE_RANK () OVER (
-                         ORDER BY rep DESC, last_received ASC
-                     ) rank, 
-                     user_id, rep FROM rep 
+            # Served by rep_leaderboard_idx - only the top rows are read
+            sql = '''SELECT user_id, rep FROM rep
                      WHERE server_id=$1
+                     ORDER BY rep DESC, last_received ASC
                      LIMIT 50'''
 
             rows = await conn.fetch(sql, interaction.guild_id)
         except Exception:
             log.error('Error while retrieving rep data', exc_info=True)
+            return
 
         # Make data usable
+        members = await self._get_members(guild, (row['user_id'] for row in rows))
         data = list()
         pos = 1
         for row in rows:
-            m = await self.bot.get_or_fetch_member(guild, row['user_id'])
+            m = members.get(row['user_id'])
             if m is None:
                 continue
 
-            data.append({
-                'Rank': pos,
-                'User': m.__str__(),
-                'Rep': row['rep']
-            })
-
+            data.append([pos, m.__str__(), row['rep']])
             pos += 1
 
+        headers = ['Rank', 'User', 'Rep']
+
         # Start paginator
         ctx = await commands.Context.from_interaction(interaction)
 
         p = TabularPages(
-            entries=data, ctx=ctx, headers='keys')
+            entries=data, ctx=ctx, headers=headers)
         p.embed.set_author(name=interaction.user.display_name)
         await p.start()
 
@@ -503,12 +515,9 @@ class Rep(commands.Cog):
     @rep_group.command(name='rewards')
     async def rewards(self, interaction: discord.Interaction) -> None:
         """ Display rep associated rewards. """
-        # Defer
-        await interaction.response.defer()
-
-        # Validation
-        if not await self._get_rep_enabled(interaction.guild_id):
-            return await interaction.edit_original_response(content=NOT_ENABLED)
+        # Validation - defers the interaction when enabled
+        if not await self._defer_if_enabled(interaction):
+            return
 
         conn = self.bot.pool
         guild = interaction.guild
@@ -519,6 +528,7 @@ class Rep(commands.Cog):
             rows = await conn.fetch(sql, guild.id, SYSTEM)
         except Exception:
             log.error('Error while displaying rewards.', exc_info=True)
+            return
 
         if len(rows) == 0:
             return
@@ -546,12 +556,9 @@ class Rep(commands.Cog):
         link: Optional[bool]
     ) -> None:
         """ Displays the reputation log for the server."""
-        # Defer
-        await interaction.response.defer()
-
-        # Validation
-        if not await self._get_rep_enabled(interaction.guild_id):
-            return await interaction.edit_original_response(content=NOT_ENABLED)
+        # Validation - defers the interaction when enabled
+        if not await self._defer_if_enabled(interaction):
+            return
 
         # Data builder
         guild = interaction.guild
@@ -576,12 +583,15 @@ class Rep(commands.Cog):
 
         except Exception:
             log.error('Error while getting rep log data.', exc_info=True)
+            return
 
         # Get display ready
-        data = [{
+        members = await self._get_members(
+            guild, {row['giver'] for row in rows} | {row['receiver'] for row in rows})
+        data: list[RepLogRow] = [{
             'time': row['time'].strftime("%d %b %y %H:%M"),
-            'giver': (await self.bot.get_or_fetch_member(guild, row['giver'])).__str__(),
-            'recipient': (await self.bot.get_or_fetch_member(guild, row['receiver'])).__str__(),
+            'giver': members.get(row['giver']).__str__(),
+            'recipient': members.get(row['receiver']).__str__(),
             'amount': row['amount'],
             'link': row['message_link']
         } for row in rows]
@@ -595,6 +605,65 @@ class Rep(commands.Cog):
 
         return
 
+    # ____________________ Create Task  ______________________
+    def _create_task(self, coro: Coroutine[Any, Any, None]) -> None:
+        # Hold a reference so background work isn't garbage collected
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._pending.discard(task)
+
+        if not task.cancelled() and task.exception() is not None:
+            log.error('Error in rep background task.', exc_info=task.exception())
+
+    # ____________________ Give Rep  ______________________
+    async def _give_rep(self, server_id: int, user_ids: list[int], amount: int, now: datetime) -> dict[int, int]:
+        # Buffer the grant and wait for the flush that writes it, returns the new rep per user
+        for user_id in user_ids:
+            prev, _ = self._rep_buffer.get((server_id, user_id), (0, now))
+            self._rep_buffer[(server_id, user_id)] = (prev + amount, now)
+
+        if self._rep_flushed is None:
+            self._rep_flushed = asyncio.get_running_loop().create_future()
+            self._create_task(self._flush_rep())
+
+        reps = await asyncio.shield(self._rep_flushed)
+        return {user_id: reps[(server_id, user_id)] for user_id in user_ids}
+
+    async def _flush_rep(self) -> None:
+        try:
+            await asyncio.sleep(REP_FLUSH_DELAY)
+        finally:
+            await self._write_rep()
+
+    async def _write_rep(self) -> None:
+        buffer, self._rep_buffer = self._rep_buffer, dict()
+        flushed, self._rep_flushed = self._rep_flushed, None
+
+        # Already written, e.g. by cog_unload
+        if flushed is None:
+            return
+
+        try:
+            keys = list(buffer)
+            rows = await self.bot.pool.fetch(
+                GIVE_REP_SQL,
+                [server_id for server_id, _ in keys],
+                [user_id for _, user_id in keys],
+                [buffer[k][0] for k in keys],
+                [buffer[k][1] for k in keys],
+            )
+        except Exception as e:
+            flushed.set_exception(e)
+        else:
+            flushed.set_result({(row['server_id'], row['user_id']): row['rep'] for row in rows})
+        finally:
+            # Never leave _give_rep callers waiting, e.g. when cancelled mid-write
+            if not flushed.done():
+                flushed.set_exception(RuntimeError('Rep flush was cancelled.'))
+
     # ____________________ Log Rep  ______________________
     async def _log_rep(
         self,
@@ -605,62 +674,101 @@ class Rep(commands.Cog):
         time: datetime,
         amount: int = 1
     ) -> None:
+        if len(receivers) == 0:
+            return
+
         # Data builder
         conn = self.bot.pool
         channel = message.channel
         link = message.to_reference().jump_url
 
         try:
-            # Add to regular logger
-            sql = '''INSERT INTO logger (server_id, user_id, channel_id, last_gave_rep)
-                    VALUES ($1, $2, $3, $4)
-                    ON CONFLICT (server_id, user_id)
-                    DO UPDATE SET last_gave_rep=$4
-                    '''
-            await conn.execute(sql, guild.id, giver.id, channel.id, time)
-
-            # Add to rep logger
-            sql = '''INSERT INTO rep_log(
+            # Add to regular logger and rep logger in one round trip
+            sql = '''WITH giver_log AS (
+                        INSERT INTO logger (server_id, user_id, channel_id, last_gave_rep)
+                        VALUES ($1, $2, $3, $6)
+                        ON CONFLICT (server_id, user_id)
+                        DO UPDATE SET last_gave_rep=$6
+                    )
+                    INSERT INTO rep_log(
                         server_id, giver, receiver, amount, message_link, time
                         )
-                    VALUES ($1, $2, $3, $4, $5, $6)
+                    SELECT $1, $2, receiver, $4, $5, $6
+                    FROM unnest($7::bigint[]) AS receiver
                     '''
-            vals = [(guild.id, giver.id, r.id, amount, link, time)
-                    for r in receivers]
-            await conn.executemany(sql, vals)
+            await conn.execute(sql, guild.id, giver.id, channel.id, amount, link, time,
+                               [r.id for r in receivers])
 
         except Exception:
             log.error('Error while logging rep.', exc_info=True)
 
         return
 
-    # _______________ Get Excluded Channels  __________________
-    @alru_cache(maxsize=128)
-    async def _get_excluded_channels(self, server_id: int) -> list[int]:
-        # Get pool
+    # ____________________ Get Members  ______________________
+    async def _get_members(
+        self,
+        guild: discord.Guild,
+        member_ids: Iterable[int]
+    ) -> dict[int, discord.Member]:
+        # Cache hits first, the rest in as few gateway requests as possible
+        return {m.id: m async for m in self.bot.resolve_member_ids(guild, set(member_ids))}
+
+    # ____________________ Get Rewards  ______________________
+    async def _get_rewards(self, server_id: int) -> list[tuple[int, int]]:
+        # Guilds missed by cog_load are read on first use, sorted by val
+        rewards = self._rewards.get(server_id)
+        if rewards is not None:
+            return rewards
+
         conn = self.bot.pool
 
         try:
-            sql = 'SELECT excluded_rep_channels FROM settings WHERE server_id=$1'
-            res = await conn.fetchrow(sql, server_id)
-
-            if res is not None:
-                return res['excluded_rep_channels']
-            else:
-                return list()
+            sql = '''SELECT val, role_id FROM rewards
+                     WHERE server_id=$1 AND type=$2
+                     ORDER BY val ASC, role_id ASC'''
+            rows = await conn.fetch(sql, server_id, SYSTEM)
         except Exception:
-            log.error('Error while fetching excluded channels.', exc_info=True)
+            log.error('Error while loading rep rewards.', exc_info=True)
             return list()
 
+        rewards = [(row['val'], row['role_id']) for row in rows]
+        self._rewards[server_id] = rewards
+        return rewards
+
+    # _____________________ Rep Settings  _____________________
+    async def _get_rep_settings(self, server_id: int) -> RepSettings:
+        # Guilds without a readable settings row get the table defaults
+        settings = await self._settings.get(server_id)
+        return settings if settings is not None else DEFAULT_SETTINGS
+
     # _____________________ Rep Enabled  _____________________
-    async def _is_excluded_channel(
+    async def _get_rep_enabled(self, server_id: int) -> bool:
+        return (await self._get_rep_settings(server_id)).enabled
+
+    # _____________________ Defer If Enabled  _____________________
+    async def _defer_if_enabled(self, interaction: discord.Interaction) -> bool:
+        # Cached settings are answered directly, a database read only happens after deferring
+        if interaction.guild_id in self._settings:
+            if not await self._get_rep_enabled(interaction.guild_id):
+                await interaction.response.send_message(NOT_ENABLED, ephemeral=True)
+                return False
+
+            await interaction.response.defer()
+            return True
+
+        await interaction.response.defer()
+        if not await self._get_rep_enabled(interaction.guild_id):
+            await interaction.edit_original_response(content=NOT_ENABLED)
+            return False
+
+        return True
+
+    # _________________ Excluded Channel  ____________________
+    def _is_excluded_channel(
         self,
         channel: GuildWritableChannels,
-        guild: discord.Guild
+        channels: frozenset[int]
     ) -> bool:
-        # Get list of excluded channels
-        channels: set[int] = set(await self._get_excluded_channels(guild.id))
-
         # Check if channel is a thread or post
         parent: Optional[int] = getattr(channel, 'parent_id', None)
         category = channel.category_id
@@ -676,25 +784,6 @@ class Rep(commands.Cog):
 
         return False
 
-    # _____________________ Rep Enabled  _____________________
-    @alru_cache(maxsize=128)
-    async def _get_rep_enabled(self, server_id: int) -> Optional[bool]:
-        # Get pool
-        conn = self.bot.pool
-
-        try:
-            sql = 'SELECT enable_rep FROM settings WHERE server_id=$1'
-            res = await conn.fetchrow(sql, server_id)
-
-            if res is not None:
-                return res['enable_rep']
-            else:
-                return None
-
-        except Exception:
-            log.error('Error while checking enabled rep.', exc_info=True)
-            return None
-
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #                         Setup
@@ -5,7 +5,7 @@ from __future__ import annotations
 
 # Standard library imports
 import logging
-from typing import TYPE_CHECKING, Literal, Optional
+from typing import TYPE_CHECKING, Any, Literal, Optional
 
 # Third party imports
 import discord  # noqa
@@ -20,15 +20,34 @@ if TYPE_CHECKING:
     from asyncpg import Pool
     from main.Zen import Zen
     from utils.context import Context
-    from main.cogs.loggingCog import LoggingCog
-    from main.cogs.xp import XP
-    from main.cogs.rep import Rep
-    from main.cogs.game import Game
 
 
 log = logging.getLogger(__name__)
 GuildWritableChannels = discord.TextChannel | discord.CategoryChannel | discord.ForumChannel | discord.Thread  # type: ignore
 
+# Columns the settings commands may write - see Settings._update_settings
+SETTINGS_COLUMNS = frozenset((
+    'logging_channel',
+    'enable_leveling',
+    'enable_rep',
+    'enable_game',
+    'game_category',
+    'game_channels_limit',
+))
+
+# Excluded rep channels are edited in place, returning the new list
+EXCLUDE_ADD_SQL = '''UPDATE settings
+                     SET excluded_rep_channels=ARRAY(
+                         SELECT DISTINCT unnest(excluded_rep_channels || $2::bigint[]))
+                     WHERE server_id=$1
+                     RETURNING excluded_rep_channels'''
+EXCLUDE_REMOVE_SQL = '''UPDATE settings
+                        SET excluded_rep_channels=ARRAY(
+                            SELECT unnest(excluded_rep_channels)
+                            EXCEPT SELECT unnest($2::bigint[]))
+                        WHERE server_id=$1
+                        RETURNING excluded_rep_channels'''
+
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #                         Config
@@ -42,15 +61,20 @@ GuildWritableChannels = discord.TextChannel | discord.CategoryChannel | discord.
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #                  Create Settings Instance
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-async def create_settings_instance(pool: Pool, guild: discord.Guild) -> None:
-    """Create a settings instance for a guild."""
+CREATE_SETTINGS_SQL = '''INSERT INTO settings(server_id, owner_id)
+                         VALUES($1, $2)
+                         ON CONFLICT (server_id) DO NOTHING'''
+
+
+async def create_settings_instance(pool: Pool, *guilds: discord.Guild) -> bool:
+    """Create a settings instance for guilds that don't have one yet."""
     try:
-        sql = '''INSERT INTO settings(server_id, owner_id)
-                                     VALUES($1, $2)
-              '''
-        await pool.execute(sql, guild.id, guild.owner_id)
+        await pool.executemany(CREATE_SETTINGS_SQL, [(g.id, g.owner_id) for g in guilds])
     except Exception:
         log.error('Unable to create guild settings', exc_info=True)
+        return False
+
+    return True
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -61,6 +85,18 @@ class Settings(commands.Cog):
 
     def __init__(self, bot: Zen) -> None:
         self.bot: Zen = bot
+        # Guilds known to have a settings row
+        self._existing: set[int] = set()
+
+    async def cog_load(self) -> None:
+        # Only guilds without a row are written in on_ready
+        try:
+            rows = await self.bot.pool.fetch('SELECT server_id FROM settings')
+        except Exception:
+            log.error('Error while loading settings.', exc_info=True)
+            return
+
+        self._existing.update(row['server_id'] for row in rows)
 
     # --------------------------------------------------
     #               App Commands Settings
@@ -82,28 +118,21 @@ class Settings(commands.Cog):
         # Defer interaction
         await interaction.response.defer()
 
-        # Update database
-        conn = self.bot.pool
-
         # Check if exists
         await self._check_existence(interaction.guild)
 
         # Update
         try:
             chn: Optional[int] = channel.id if value else None
-            sql = ''' UPDATE settings SET logging_channel=$2
-                      WHERE server_id=$1'''
-            await conn.execute(sql, interaction.guild_id, chn)
+            changed = await self._update_settings(interaction.guild_id, logging_channel=chn)
 
         except Exception:
             log.error('Database query error.', exc_info=True)
+            return
 
         # Update Cache
-        cog: Optional[LoggingCog] = self.bot.get_cog('LoggingCog')  # type: ignore
-        if cog is not None:
-            cog._get_logging_channel.cache_clear()
-        else:
-            log.error(f'Cog not found - {cog}.', exc_info=True)
+        if changed:
+            self.bot.dispatch('settings_changed', interaction.guild_id)
 
         # Send Update
         if value:
@@ -120,28 +149,21 @@ class Settings(commands.Cog):
         """Enable the leveling system for this guild."""
         # Defer
         await interaction.response.defer()
-        conn = self.bot.pool
 
         # Check if exists
         await self._check_existence(interaction.guild)
 
         # Update
         try:
-            sql = ''' UPDATE settings SET enable_leveling=$2
-                      WHERE server_id=$1'''
-            await conn.execute(sql, interaction.guild_id, choice)
+            changed = await self._update_settings(interaction.guild_id, enable_leveling=choice)
 
         except Exception:
             log.error('Error while updating xp settings.', exc_info=True)
             return
 
         # Update Cache
-        cog: Optional[XP] = self.bot.get_cog('XP')  # type: ignore
-        if cog is not None:
-            cog._get_xp_enabled.cache_clear()
-        else:
-            log.error(f'Cog not found - {cog}.', exc_info=True)
-            return
+        if changed:
+            self.bot.dispatch('settings_changed', interaction.guild_id)
 
         # Send Update
         if choice:
@@ -158,28 +180,21 @@ class Settings(commands.Cog):
         """Enable the reputation system for this guild."""
         # Defer
         await interaction.response.defer()
-        conn = self.bot.pool
 
         # Check if exists
         await self._check_existence(interaction.guild)
 
         # Update
         try:
-            sql = '''UPDATE settings SET enable_rep=$2
-                      WHERE server_id=$1'''
-            await conn.execute(sql, interaction.guild_id, choice)
+            changed = await self._update_settings(interaction.guild_id, enable_rep=choice)
 
         except Exception:
             log.error('Error while updating rep settings.', exc_info=True)
             return
 
         # Update Cache
-        cog: Optional[Rep] = self.bot.get_cog('Rep')  # type: ignore
-        if cog is not None:
-            cog._get_rep_enabled.cache_clear()
-        else:
-            log.error(f'Cog not found - {cog}.', exc_info=True)
-            return
+        if changed:
+            self.bot.dispatch('settings_changed', interaction.guild_id)
 
         # Send Update
         if choice:
@@ -212,45 +227,38 @@ class Settings(commands.Cog):
 
         # Update db
         try:
-            sql = '''SELECT excluded_rep_channels FROM settings WHERE server_id=$1'''
-            res = await conn.fetchrow(sql, guild.id)
-
-            if res is None:
-                log.error('Error while excluding channels.', exc_info=True)
+            if action == 'list':
+                sql = '''SELECT excluded_rep_channels FROM settings WHERE server_id=$1'''
+                existing_channels = await conn.fetchval(sql, guild.id) or list()
 
-            existing_channels = set(res['excluded_rep_channels'])
-
-            if action == 'add':
-                channel_ids = channel_ids.union(existing_channels)
-
-            elif action == 'remove':
-                channel_ids = existing_channels.difference(channel_ids)
-
-            elif action == 'list':
-                mentions = [self.bot.get_channel(c).mention for c in existing_channels]
+                # Channels deleted since being excluded are skipped
+                mentions = [c.mention for c in map(guild.get_channel, existing_channels) if c is not None]
 
                 msg = f"Rep can't be gained in the following channels: {', '.join( mentions)}"
                 await ctx.reply(content=msg)
                 return
 
+            elif action == 'add':
+                sql = EXCLUDE_ADD_SQL
+
+            elif action == 'remove':
+                sql = EXCLUDE_REMOVE_SQL
+
             else:
                 return
 
-            sql = '''UPDATE settings 
-                     SET excluded_rep_channels=$2
-                     WHERE server_id=$1'''
-            await conn.execute(sql, guild.id, list(channel_ids))
+            # Set arithmetic happens in Postgres, atomically
+            res = await conn.fetchval(sql, guild.id, list(channel_ids))
+            if res is None:
+                log.error('Error while excluding channels - no settings row.')
+                return
 
         except Exception:
             log.error('Error while excluding channels.', exc_info=True)
+            return
 
         # Update Cache
-        cog: Optional[Rep] = self.bot.get_cog('Rep')  # type: ignore
-        if cog is not None:
-            cog._get_excluded_channels.cache_clear()
-        else:
-            log.error(f'Cog not found - {cog}.', exc_info=True)
-            return
+        self.bot.dispatch('settings_changed', guild.id)
 
         await ctx.reply('Updated Excluded Channels.')
         return
@@ -264,34 +272,25 @@ class Settings(commands.Cog):
         """Enable the game system for this guild."""
         # Defer
         await interaction.response.defer()
-        conn = self.bot.pool
 
         # Check if exists
         await self._check_existence(interaction.guild)
 
         # Update
         try:
-            sql = f'''UPDATE settings 
-                     SET enable_game=$2,
-                         game_category=$3
-                        {",game_channels_limit=$4" if max_channels is not None else ""}
-                     WHERE server_id=$1'''
-            if max_channels is None:
-                await conn.execute(sql, interaction.guild_id, choice, category.id)
-            else:
-                await conn.execute(sql, interaction.guild_id, choice, category.id, max_channels)
+            columns: dict[str, Any] = dict(enable_game=choice, game_category=category.id)
+            if max_channels is not None:
+                columns['game_channels_limit'] = max_channels
+
+            changed = await self._update_settings(interaction.guild_id, **columns)
 
         except Exception:
             log.error('Error while updating game settings.', exc_info=True)
             return
 
         # Update Cache
-        cog: Optional[Game] = self.bot.get_cog('Game')
-        if cog is not None:
-            cog._get_game_enabled.cache_clear()
-        else:
-            log.error(f'Cog not found - {cog}.', exc_info=True)
-            return
+        if changed:
+            self.bot.dispatch('settings_changed', interaction.guild_id)
 
         # Send Update
         if choice:
@@ -301,6 +300,58 @@ class Settings(commands.Cog):
 
         await interaction.edit_original_response(content=msg)
 
+    # __________________ Configure  ___________________________
+    @settings_group.command(name='configure')
+    @app_commands.describe(xp='XP system On or Off', rep='Rep system On or Off', log_channel='Logging channel')
+    async def configure(
+        self,
+        interaction: discord.Interaction,
+        xp: Optional[bool] = None,
+        rep: Optional[bool] = None,
+        log_channel: Optional[discord.TextChannel] = None,
+    ) -> None:
+        """Change several settings for this guild at once."""
+        # Data builder
+        columns: dict[str, Any] = dict()
+        if xp is not None:
+            columns['enable_leveling'] = xp
+        if rep is not None:
+            columns['enable_rep'] = rep
+        if log_channel is not None:
+            columns['logging_channel'] = log_channel.id
+
+        if len(columns) == 0:
+            return await interaction.response.send_message('Nothing to change.', ephemeral=True)
+
+        # Defer
+        await interaction.response.defer()
+
+        # Check if exists
+        await self._check_existence(interaction.guild)
+
+        # Update - one statement for every changed column
+        try:
+            changed = await self._update_settings(interaction.guild_id, **columns)
+
+        except Exception:
+            log.error('Error while configuring settings.', exc_info=True)
+            return
+
+        # Update Cache
+        if changed:
+            self.bot.dispatch('settings_changed', interaction.guild_id)
+
+        # Send Update
+        lines: list[str] = list()
+        if xp is not None:
+            lines.append(f"XP system is now {'enabled' if xp else 'disabled'}.")
+        if rep is not None:
+            lines.append(f"Rep system is now {'enabled' if rep else 'disabled'}.")
+        if log_channel is not None:
+            lines.append(f'Logging channel set to {log_channel.mention}.')
+
+        await interaction.edit_original_response(content='\n'.join(lines))
+
     role_rewards_group = app_commands.Group(
         name='rewards', description='Set up role rewards for different systems.', parent=settings_group
     )
@@ -334,6 +385,9 @@ class Settings(commands.Cog):
             '''
             await conn.execute(sql, guild.id, role.id, system.lower(), value)
 
+            # Update Cache
+            self.bot.dispatch('rewards_changed', guild.id, system.lower())
+
             msg = f'`{role.name}` has been set as a reward for the `{system}` system.'
             await interaction.edit_original_response(content=msg)
 
@@ -356,35 +410,60 @@ class Settings(commands.Cog):
         guild = interaction.guild
 
         try:
-            sql = '''DELETE FROM rewards 
-                    WHERE EXISTS
-                        (SELECT val FROM rewards 
-                        WHERE server_id=$1 AND role_id=$2 AND type=$3)
+            sql = '''DELETE FROM rewards
+                     WHERE server_id=$1 AND role_id=$2 AND type=$3
             '''
             await conn.execute(sql, guild.id, role.id, system.lower())
 
+            # Update Cache
+            self.bot.dispatch('rewards_changed', guild.id, system.lower())
+
             msg = f'`{role.name}` has been removed as a reward for the `{system}` system.'
             await interaction.edit_original_response(content=msg)
 
         except Exception:
             log.error('Error while setting role reward.', exc_info=True)
 
+    # _________________ Guild Join  _________________________
+    @commands.Cog.listener(name='on_ready')
+    async def on_ready(self) -> None:
+        # Seed rows for guilds joined while offline, in one batch
+        guilds = [g for g in self.bot.guilds if g.id not in self._existing]
+        if len(guilds) > 0 and await create_settings_instance(self.bot.pool, *guilds):
+            self._existing.update(g.id for g in guilds)
+
+    @commands.Cog.listener(name='on_guild_join')
+    async def on_guild_join(self, guild: discord.Guild) -> None:
+        await self._check_existence(guild)
+
+    # _________________ Guild Remove  _______________________
+    @commands.Cog.listener(name='on_guild_remove')
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        self._existing.discard(guild.id)
+
+    # ________________ Update Settings  ____________________
+    async def _update_settings(self, server_id: int, **columns: Any) -> bool:
+        # Write every given column in one statement, names are never user input
+        if not columns.keys() <= SETTINGS_COLUMNS:
+            raise ValueError(f'Unknown settings columns: {columns.keys() - SETTINGS_COLUMNS}')
+
+        # Unchanged rows are skipped, returns whether anything was written
+        params = [f'${i}' for i in range(2, len(columns) + 2)]
+        assignments = ', '.join(f'{col}={param}' for col, param in zip(columns, params))
+        sql = f'''UPDATE settings SET {assignments}
+                  WHERE server_id=$1
+                  AND ({', '.join(columns)}) IS DISTINCT FROM ({', '.join(params)})'''
+        status = await self.bot.pool.execute(sql, server_id, *columns.values())
+        return status != 'UPDATE 0'
+
     # ________________ Check Guild Data  ___________________
     async def _check_existence(self, guild: discord.Guild | None) -> None:
-        if not guild:
+        if not guild or guild.id in self._existing:
             return
 
-        # Check if exists
-        conn = self.bot.pool
-        try:
-            sql = '''SELECT * FROM settings WHERE server_id=$1'''
-            res = await conn.fetchrow(sql, guild.id)
-
-            if res is None:
-                await create_settings_instance(conn, guild)
-
-        except Exception:  # pylint: disable=broad-except
-            log.error('Database query error.', exc_info=True)
+        # Create if missing - a no-op when the row exists
+        if await create_settings_instance(self.bot.pool, guild):
+            self._existing.add(guild.id)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -8,10 +8,11 @@ import asyncio
 import enum
 import inspect
 import logging
+import random
 import time
 
-from functools import wraps
-from typing import Any, Awaitable, Callable, Coroutine, MutableMapping, Protocol, TypeVar
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Coroutine, Generic, Iterator, MutableMapping, Optional, Protocol, TypeVar
 
 # Third party imports
 from lru import LRU
@@ -21,8 +22,16 @@ from discord.ext import commands
 # Local application imports
 
 
+if TYPE_CHECKING:
+    from asyncpg import Record
+    from main.Zen import Zen
+
+
 R = TypeVar('R')
 log = logging.getLogger(__name__)
+SETTINGS_TTL = 3600.0
+# Spreads a bulk load's expiry over the last quarter of the ttl
+SETTINGS_TTL_JITTER = 0.25
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -68,29 +77,139 @@ def _wrap_new_coroutine(value: R) -> Coroutine[Any, Any, R]:
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
 #                      Expiring Cache
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
-class ExpiringCache(dict):
-    def __init__(self, seconds: float) -> None:
+class ExpiringCache(MutableMapping[Any, Any]):
+    # Entries are stored as (value, expires_at), only the values are ever exposed
+    def __init__(self, seconds: float, *, jitter: float = 0.0) -> None:
         self.__ttl: float = seconds
-        super().__init__()
+        self.__jitter: float = jitter
+        self.__data: dict[Any, tuple[Any, float]] = dict()
+
+    def __expires(self, now: float) -> float:
+        # Jitter shortens each entry's ttl by up to that fraction
+        return now + self.__ttl * (1.0 - random.random() * self.__jitter)
 
     def __verify_cache_integrity(self) -> None:
         current_time: float = time.monotonic()
-        to_remove = [k for (k, (v, t)) in self.items()
-                     if current_time > (t + self.__ttl)]
+        to_remove = [k for (k, (v, t)) in self.__data.items()
+                     if current_time > t]
         for k in to_remove:
-            del self[k]
+            del self.__data[k]
+
+    def __getitem__(self, key: Any) -> Any:
+        # Reads only check their own key, the full sweep happens on writes
+        value, t = self.__data[key]
+        if time.monotonic() > t:
+            del self.__data[key]
+            raise KeyError(key)
+        return value
 
-    def __contains__(self, key: str) -> bool:
+    def __setitem__(self, key: Any, value: Any) -> None:
         self.__verify_cache_integrity()
-        return super().__contains__(key)
+        self.__data[key] = (value, self.__expires(time.monotonic()))
+
+    def __delitem__(self, key: Any) -> None:
+        _, t = self.__data.pop(key)
+        if time.monotonic() > t:
+            raise KeyError(key)
 
-    def __getitem__(self, key: str) -> Any:
+    def __iter__(self) -> Iterator[Any]:
         self.__verify_cache_integrity()
-        return super().__getitem__(key)
+        return iter(list(self.__data))
+
+    def __len__(self) -> int:
+        self.__verify_cache_integrity()
+        return len(self.__data)
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({dict(self.items())!r})'
+
+    def clear(self) -> None:
+        self.__data.clear()
 
-    def __setitem__(self, key: str, value: Any) -> None:
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        # One sweep for a bulk load
         self.__verify_cache_integrity()
-        super().__setitem__(key, value)
+        now = time.monotonic()
+        self.__data.update((k, (v, self.__expires(now))) for k, v in dict(*args, **kwargs).items())
+
+
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+#                      Settings Cache
+# +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
+class SettingsCache(Generic[R]):
+    """Per guild values read from the settings table.
+
+    Warmed in one query by load(), then read per guild on a miss, with
+    concurrent misses for a guild sharing one read. Entries expire after
+    ttl seconds, less some jitter so a warm-up doesn't expire all at once,
+    and are dropped on the settings_changed event.
+    """
+
+    def __init__(self, bot: Zen, columns: str, convert: Callable[[Record], R], *, ttl: float = SETTINGS_TTL) -> None:
+        self.bot: Zen = bot
+        self.columns: str = columns
+        self.convert: Callable[[Record], R] = convert
+        self._cache: MutableMapping[int, Optional[R]] = ExpiringCache(ttl, jitter=SETTINGS_TTL_JITTER)
+        self._loading: dict[int, asyncio.Task[Optional[R]]] = dict()
+
+    async def load(self) -> None:
+        self.bot.add_listener(self._on_settings_changed, 'on_settings_changed')
+
+        try:
+            rows = await self.bot.pool.fetch(f'SELECT server_id, {self.columns} FROM settings')
+        except Exception:
+            log.error(f'Error while loading settings - {self.columns}.', exc_info=True)
+            return
+
+        self._cache.update((row['server_id'], self.convert(row)) for row in rows)
+
+    def close(self) -> None:
+        self.bot.remove_listener(self._on_settings_changed, 'on_settings_changed')
+
+    async def get(self, server_id: int) -> Optional[R]:
+        # None when the guild has no settings row, failed reads aren't cached
+        try:
+            return self._cache[server_id]
+        except KeyError:
+            pass
+
+        task = self._loading.get(server_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch(server_id))
+            task.add_done_callback(partial(self._fetch_done, server_id))
+            self._loading[server_id] = task
+
+        return await asyncio.shield(task)
+
+    def __contains__(self, server_id: int) -> bool:
+        # Whether get() would answer without a database read
+        return server_id in self._cache
+
+    def invalidate(self, server_id: int) -> None:
+        # A read already in flight is left uncached
+        self._cache.pop(server_id, None)
+        self._loading.pop(server_id, None)
+
+    async def _fetch(self, server_id: int) -> Optional[R]:
+        try:
+            sql = f'SELECT {self.columns} FROM settings WHERE server_id=$1'
+            row = await self.bot.pool.fetchrow(sql, server_id)
+        except Exception:
+            log.error(f'Error while fetching settings - {self.columns}.', exc_info=True)
+            return None
+
+        value = self.convert(row) if row is not None else None
+        if self._loading.get(server_id) is asyncio.current_task():
+            self._cache[server_id] = value
+
+        return value
+
+    def _fetch_done(self, server_id: int, task: asyncio.Task[Optional[R]]) -> None:
+        if self._loading.get(server_id) is task:
+            del self._loading[server_id]
+
+    async def _on_settings_changed(self, server_id: int) -> None:
+        self.invalidate(server_id)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -25,15 +25,13 @@ async def check_guild_permissions(ctx, perms, check=all):
     Returns:
         _type_: _description_
     """
-    is_owner = await ctx.bot.is_owner(ctx.author)
-    if is_owner:
-        return True
-
-    if ctx.guild is None:
-        return False
+    # Permissions are local, only fall back to the owner check when they fail
+    if ctx.guild is not None:
+        resolved = ctx.author.guild_permissions
+        if check(getattr(resolved, name, None) == value for name, value in perms.items()):
+            return True
 
-    resolved = ctx.author.guild_permissions
-    return check(getattr(resolved, name, None) == value for name, value in perms.items())
+    return await ctx.bot.is_owner(ctx.author)
 
 
 async def check_permissions(ctx, perms, *, check=all) -> bool:
@@ -47,12 +45,11 @@ async def check_permissions(ctx, perms, *, check=all) -> bool:
     Returns:
         bool: _description_
     """
-    is_owner = await ctx.bot.is_owner(ctx.author)
-    if is_owner:
+    resolved = ctx.channel.permissions_for(ctx.author)
+    if check(getattr(resolved, name, None) == value for name, value in perms.items()):
         return True
 
-    resolved = ctx.channel.permissions_for(ctx.author)
-    return check(getattr(resolved, name, None) == value for name, value in perms.items())
+    return await ctx.bot.is_owner(ctx.author)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
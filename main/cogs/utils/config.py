@@ -31,6 +31,7 @@ class Config(Generic[_T]):
         self.loop = asyncio.get_running_loop()
         self.lock = asyncio.Lock()
         self._db: Dict[str, Union[_T, Any]] = {}
+        self._saving: Optional[asyncio.Task[None]] = None
 
         if load_later:
             self.loop.create_task(self.load())
@@ -51,13 +52,22 @@ class Config(Generic[_T]):
     def _dump(self):
         temp = f'{self.name}-{uuid.uuid4()}.tmp'
         with open(temp, 'w', encoding='utf-8') as tmp:
-            json.dump(self._db.copy(), tmp, ensure_ascii=True, indent='\t',
+            json.dump(self._db.copy(), tmp, ensure_ascii=True,
                       cls=self.encoder, separators=(',', ':'))
 
         os.replace(temp, self.name)
 
     async def save(self) -> None:
+        # Saves requested while a write is running share the next one, returns once written
+        if self._saving is None:
+            self._saving = self.loop.create_task(self._save())
+
+        await asyncio.shield(self._saving)
+
+    async def _save(self) -> None:
         async with self.lock:
+            # Changes made from here on schedule a new save
+            self._saving = None
             await self.loop.run_in_executor(None, self._dump)
 
     @overload
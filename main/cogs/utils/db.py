@@ -8,10 +8,18 @@ from __future__ import annotations
 # Standard library imports
 import json
 import logging
-from typing import TYPE_CHECKING
+import os
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
 
 # Third party imports
 import asyncpg
+import discord
+
+try:
+    import orjson  # type: ignore
+except ImportError:
+    orjson = None
 
 
 # Local application imports
@@ -61,13 +69,24 @@ class DB:
     @classmethod
     async def create_pool(cls, uri: str, **kwargs):
         def _encode_jsonb(value):
+            if orjson is not None:
+                return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
             return json.dumps(value)
 
         def _decode_jsonb(value):
+            if orjson is not None:
+                return orjson.loads(value)
             return json.loads(value)
 
         old_init = kwargs.pop('init', None)
 
+        # Room for command bursts, and a statement cache that holds every query the cogs use
+        kwargs.setdefault('min_size', 5)
+        kwargs.setdefault('max_size', 20)
+        kwargs.setdefault('max_inactive_connection_lifetime', 300.0)
+        kwargs.setdefault('statement_cache_size', 256)
+        kwargs.setdefault('max_cached_statement_lifetime', 0)
+
         async def init(conn):
             await conn.set_type_codec('jsonb', schema='pg_catalog', encoder=_encode_jsonb, decoder=_decode_jsonb, format='text')
             if old_init is not None:
@@ -79,6 +98,7 @@ class DB:
         # Do db stuff
         try:
             await cls.create_schemas(pool)
+            await cls.migrate(pool)
         except Exception as e:
             print(e)
 
@@ -99,17 +119,90 @@ class DB:
             sql: str = f"{ct} {table}({query})"
             await conn.execute(sql)
 
-        # TODO: Optionally create indexes
+        # Optionally create indexes
+        for index in schema.indexes:
+            await conn.execute(f"CREATE INDEX IF NOT EXISTS {index}")
 
     # Get Migrations.
     @classmethod
-    def get_migrations(cls):
-        pass
+    def get_migrations(cls) -> dict[str, Callable[[asyncpg.Connection], Awaitable[None]]]:
+        # Applied in order, each exactly once - see the migrations table
+        return {
+            'local_timestamps_to_utc': cls._local_timestamps_to_utc,
+        }
 
     # Migrate if needed.
     @classmethod
-    def migrate(cls, conn):
-        pass
+    async def migrate(cls, pool):
+        rows = await pool.fetch('SELECT name FROM migrations')
+        applied = {row['name'] for row in rows}
+
+        for name, migration in cls.get_migrations().items():
+            if name in applied:
+                continue
+
+            async with pool.acquire() as conn, conn.transaction():
+                await migration(conn)
+                await conn.execute('INSERT INTO migrations (name, applied) VALUES ($1, $2)',
+                                   name, discord.utils.utcnow().replace(tzinfo=None))
+
+            log.info(f'Applied migration {name}.')
+
+    @staticmethod
+    def _host_timezone() -> Optional[str]:
+        # Postgres needs the zone name, a fixed offset would get DST wrong
+        name = os.environ.get('TZ', '').lstrip(':')
+        if name:
+            return name
+
+        path = os.path.realpath('/etc/localtime')
+        if 'zoneinfo/' in path:
+            return path.split('zoneinfo/', 1)[1]
+
+        return None
+
+    @classmethod
+    async def _local_timestamps_to_utc(cls, conn) -> None:
+        """Rewrite the rep and xp timestamps the bot wrote in host local time as UTC.
+
+        Rep and xp used to write datetime.now(). Rows filled by a column
+        default were written in the database's TimeZone instead, so every
+        row is only converted when that is the host's zone as well. Otherwise
+        rep and logger rows are converted where rep_log shows the bot wrote
+        them, and xp, only a cooldown, is left to catch up on its own.
+        """
+        # Nothing was ever written off UTC
+        if time.timezone == 0 and (not time.daylight or time.altzone == 0):
+            return
+
+        host_tz = cls._host_timezone()
+        if host_tz is None:
+            raise SchemaError('Unable to determine the host time zone to convert timestamps from.')
+
+        db_tz = await conn.fetchval("SELECT current_setting('TimeZone')")
+        defaults_local = db_tz == host_tz
+        to_utc = "AT TIME ZONE $1 AT TIME ZONE 'UTC'"
+
+        # Bot written rep and logger times match their rep_log row, so convert them first
+        rep_written = '' if defaults_local else '''AND EXISTS (
+            SELECT 1 FROM rep_log l
+            WHERE l.server_id=rep.server_id AND l.receiver=rep.user_id AND l.time=rep.last_received)'''
+        logger_written = '' if defaults_local else '''AND EXISTS (
+            SELECT 1 FROM rep_log l
+            WHERE l.server_id=logger.server_id AND l.giver=logger.user_id AND l.time=logger.last_gave_rep)'''
+
+        await conn.execute(f'''UPDATE rep SET last_received=last_received {to_utc}
+                               WHERE last_received IS NOT NULL {rep_written}''', host_tz)
+        await conn.execute(f'''UPDATE logger SET last_gave_rep=last_gave_rep {to_utc}
+                               WHERE last_gave_rep IS NOT NULL {logger_written}''', host_tz)
+        await conn.execute(f'''UPDATE rep_log SET time=time {to_utc}
+                               WHERE time IS NOT NULL''', host_tz)
+
+        if defaults_local:
+            await conn.execute(f'''UPDATE xp SET last_xp=last_xp {to_utc}
+                                   WHERE last_xp IS NOT NULL''', host_tz)
+        else:
+            log.warning(f'xp.last_xp left in {host_tz}, the database writes defaults in {db_tz}.')
 
     # Data integrity checks.
     # Log information
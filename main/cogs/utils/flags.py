@@ -7,7 +7,6 @@ from __future__ import annotations
 import logging
 import os
 import sys
-from turtle import title
 from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, TypeVar, overload
 from typing_extensions import Self
 
@@ -51,7 +50,7 @@ class BaseFlags:
         return self.value == 0
 
     def _has_flag(self, o: int) -> bool:
-        return (self.value & o) == 0
+        return (self.value & o) != 0
 
     def _set_flag(self, o: int, toggle: bool) -> None:
         if toggle is True:
@@ -9,16 +9,17 @@ import logging
 import random
 import re
 
+from operator import itemgetter
 from typing import TYPE_CHECKING, Optional
 
 # Third party imports
 import discord  # noqa
-from async_lru import alru_cache
 from discord import app_commands
 from discord.ext import commands
 
 
 # Local application imports
+from main.cogs.utils import cache
 from main.cogs.utils.paginator import TabularPages
 
 if TYPE_CHECKING:
@@ -37,6 +38,14 @@ SYSTEM = 'xp'
 class XP(commands.Cog):
     def __init__(self, bot: Zen) -> None:
         self.bot: Zen = bot
+        self._xp_enabled: cache.SettingsCache[bool] = cache.SettingsCache(
+            bot, 'enable_leveling', itemgetter('enable_leveling'))
+
+    async def cog_load(self) -> None:
+        await self._xp_enabled.load()
+
+    async def cog_unload(self) -> None:
+        self._xp_enabled.close()
 
     async def cog_check(self, ctx: Context) -> bool:
         return False if ctx.guild is None else True
@@ -66,7 +75,7 @@ class XP(commands.Cog):
         author = message.author
         xp: int = 0
         pre_level: int = 0
-        now = datetime.now()
+        now = message.created_at.replace(tzinfo=None)
 
         try:
             # Time Validation
@@ -111,31 +120,27 @@ class XP(commands.Cog):
         roles: list[discord.Role] = list()
 
         msg = f'`{member.display_name} reached level {level}.`'
-        await message.channel.send(content=msg, delete_after=15)
 
         try:
             sql = '''SELECT role_id FROM rewards 
                      WHERE server_id=$1 AND type=$2 AND val<=$3'''
             res: list[int] = await conn.fetch(sql, guild.id, SYSTEM, level)
 
-            if len(res) == 0:
-                return
-
             for entry in res:
                 if member.get_role(entry['role_id']) is None:
                     roles.append(guild.get_role(entry['role_id']))
 
-            if len(roles) < 1:
-                return
-
-            await member.add_roles(*roles)
+            if len(roles) > 0:
+                await member.add_roles(*roles)
 
         except Exception:
             log.error('Error while granting role rewards.', exc_info=True)
-            return
+            roles.clear()
 
-        msg = f'`{member.display_name} gained the following role(s): '
-        msg += f"{', '.join(role.name for role in roles)}`"
+        # Announce the level and any rewards in a single message
+        if len(roles) > 0:
+            msg += f'\n`{member.display_name} gained the following role(s): '
+            msg += f"{', '.join(role.name for role in roles)}`"
 
         await message.channel.send(content=msg, delete_after=15)
 
@@ -386,22 +391,8 @@ class XP(commands.Cog):
         pass
 
     # _____________________ XP Enabled  _____________________
-    @alru_cache(maxsize=128)
     async def _get_xp_enabled(self, server_id: int) -> Optional[bool]:
-        # Get pool
-        conn = self.bot.pool
-
-        try:
-            sql = 'SELECT enable_leveling FROM settings WHERE server_id=$1'
-            res = await conn.fetchrow(sql, server_id)
-
-            if res is not None:
-                return res['enable_leveling']
-            else:
-                return None
-
-        except Exception:
-            log.error('Error while checking enabled xp.', exc_info=True)
+        return await self._xp_enabled.get(server_id)
 
 
 # +++++++++++++++++++++++++++++++++++++++++++++++++++++++++++
@@ -104,6 +104,11 @@ tables: dict = {
         threads BIGINT ARRAY DEFAULT NULL
     ''',
 
+    'migrations': f'''
+        name TEXT PRIMARY KEY,
+        applied TIMESTAMP NOT NULL
+    ''',
+
     'xp': f'''
         server_id BIGINT NOT NULL,
         user_id BIGINT NOT NULL,
@@ -115,5 +120,7 @@ tables: dict = {
 }
 
 indexes: list = [
+    # Rep
+    'rep_leaderboard_idx ON rep (server_id, rep DESC, last_received ASC)',
     # Tags
 ]